@@ -13,7 +13,8 @@ setup(
     ],
     entry_points={
         "console_scripts": [
-            "ost-realsense=src.cli_entry:main"
+            "ost-realsense=src.cli_entry:main",
+            "ost-soak=src.soak:main"
         ]
     },
 )
@@ -25,6 +25,9 @@ class RealSenseCamera:
     def __init__(self, width=640, height=480, fps=30, verbose=False):
         """Initializes camera pipeline and starts streaming."""
         self.verbose = verbose
+        self.width = width
+        self.height = height
+        self.fps = fps
         try:
             # Create pipeline and enable color+depth streams
             self.pipeline = rs.pipeline()
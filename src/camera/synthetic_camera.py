@@ -0,0 +1,230 @@
+"""Synthetic camera and pose source for running the pipeline without hardware.
+
+`SyntheticCamera` mimics `RealSenseCamera`: `get_frames` returns a BGR
+image plus a depth-frame stand-in exposing `get_distance(x, y)` and a
+stream profile with intrinsics, which is everything `run_system`
+touches. Frames contain a moving skeleton with per-pixel depth noise and
+random occlusion, paced at a configurable rate (or unthrottled to
+stress the pipeline above the camera's rate).
+
+MediaPipe cannot be expected to find a stick figure, so
+`SyntheticPoseEstimator` reports the camera's ground-truth landmarks in
+the same shape as Mediapipe `results`.
+"""
+
+import math
+import time
+import logging
+from types import SimpleNamespace
+
+import cv2
+import numpy as np
+import pyrealsense2 as rs
+
+logger = logging.getLogger(__name__)
+
+NUM_LANDMARKS = 33
+
+# Rest pose in normalized image coordinates (x, y) for the 33 Mediapipe ids
+_REST_POSE = {
+    0: (0.50, 0.16),                                   # nose
+    1: (0.49, 0.14), 2: (0.48, 0.14), 3: (0.47, 0.14),  # left eye
+    4: (0.51, 0.14), 5: (0.52, 0.14), 6: (0.53, 0.14),  # right eye
+    7: (0.46, 0.15), 8: (0.54, 0.15),                   # ears
+    9: (0.49, 0.18), 10: (0.51, 0.18),                  # mouth
+    11: (0.44, 0.26), 12: (0.56, 0.26),                 # shoulders
+    13: (0.41, 0.38), 14: (0.59, 0.38),                 # elbows
+    15: (0.40, 0.49), 16: (0.60, 0.49),                 # wrists
+    17: (0.39, 0.52), 18: (0.61, 0.52),                 # pinkies
+    19: (0.40, 0.52), 20: (0.60, 0.52),                 # index fingers
+    21: (0.41, 0.51), 22: (0.59, 0.51),                 # thumbs
+    23: (0.46, 0.52), 24: (0.54, 0.52),                 # hips
+    25: (0.46, 0.68), 26: (0.54, 0.68),                 # knees
+    27: (0.46, 0.84), 28: (0.54, 0.84),                 # ankles
+    29: (0.45, 0.86), 30: (0.55, 0.86),                 # heels
+    31: (0.47, 0.88), 32: (0.53, 0.88),                 # foot index
+}
+
+# Joints that swing with the arms / legs (left side, right side)
+_ARM_JOINTS = ((13, 15, 17, 19, 21), (14, 16, 18, 20, 22))
+_LEG_JOINTS = ((25, 27, 29, 31), (26, 28, 30, 32))
+
+
+class _SyntheticProfile:
+    """Stand-in for a RealSense video stream profile."""
+
+    def __init__(self, intrinsics, profile_id=1):
+        self.intrinsics = intrinsics
+        self._id = profile_id
+
+    def unique_id(self):
+        return self._id
+
+    def as_video_stream_profile(self):
+        return self
+
+
+class _SyntheticDepthFrame:
+    """Stand-in for a RealSense depth frame backed by a depth map in meters."""
+
+    def __init__(self, depth, profile):
+        self.depth = depth
+        self.profile = profile
+
+    def get_distance(self, x, y):
+        return float(self.depth[y, x])
+
+
+class SyntheticCamera:
+    """Generate moving-skeleton color/depth frames at a configurable rate.
+
+    Parameters
+    - width, height: Frame size in pixels.
+    - fps: Target frame rate; 0 or None generates frames as fast as the
+      caller consumes them (over-rate stress).
+    - depth_noise: Standard deviation of per-pixel depth noise in meters.
+    - occlusion_rate: Probability per frame and joint that the joint has
+      no valid depth (as when hidden behind another body part).
+    - off_frame_rate: Probability per frame that a wrist leaves the image.
+    - seed: Seed for the random generator, for reproducible runs.
+    """
+
+    def __init__(self, width=640, height=480, fps=30, depth_noise=0.005,
+                 occlusion_rate=0.02, off_frame_rate=0.01, seed=0, verbose=False):
+        self.width = width
+        self.height = height
+        self.fps = fps
+        self.depth_noise = depth_noise
+        self.occlusion_rate = occlusion_rate
+        self.off_frame_rate = off_frame_rate
+        self.verbose = verbose
+        self.rng = np.random.default_rng(seed)
+
+        intrin = rs.intrinsics()
+        intrin.width, intrin.height = width, height
+        intrin.ppx, intrin.ppy = width / 2, height / 2
+        intrin.fx = intrin.fy = 0.9 * width
+        intrin.model = rs.distortion.brown_conrady
+        intrin.coeffs = [0.0] * 5
+        self.profile = _SyntheticProfile(intrin)
+
+        # Pre-generate a small bank of noise fields and cycle through it so
+        # frame generation stays cheap even when running unthrottled
+        self._noise = self.rng.normal(0.0, depth_noise, (8, height, width)).astype(np.float32)
+        self._background = np.full((height, width, 3), 40, dtype=np.uint8)
+
+        self.frame_count = 0
+        self.landmarks = []
+        self._start = time.perf_counter()
+        self._next_frame = self._start
+
+        if self.verbose:
+            logger.info(f"Synthetic camera started ({width}x{height}@{fps or 'max'})")
+
+    def _pose(self, t):
+        """Return [(x, y, depth_m)] for all landmarks at time `t` seconds."""
+        sway = 0.05 * math.sin(2 * math.pi * 0.1 * t)
+        arm = 0.06 * math.sin(2 * math.pi * 0.5 * t)
+        leg = 0.03 * math.sin(2 * math.pi * 0.5 * t + math.pi / 2)
+        base_depth = 2.0 + 0.3 * math.sin(2 * math.pi * 0.05 * t)
+
+        offsets = {}
+        for side, sign in ((0, 1), (1, -1)):
+            for jid in _ARM_JOINTS[side]:
+                offsets[jid] = (sign * arm, -abs(arm))
+            for jid in _LEG_JOINTS[side]:
+                offsets[jid] = (sign * leg, 0.0)
+
+        pose = []
+        for jid in range(NUM_LANDMARKS):
+            x, y = _REST_POSE[jid]
+            dx, dy = offsets.get(jid, (0.0, 0.0))
+            depth = base_depth + 0.05 * math.sin(t + jid)
+            pose.append((x + dx + sway, y + dy, depth))
+        return pose
+
+    def get_frames(self):
+        """Return `(color_image, depth_frame)` like `RealSenseCamera.get_frames`."""
+        if self.fps:
+            # Pace to the target rate without accumulating drift
+            self._next_frame += 1.0 / self.fps
+            delay = self._next_frame - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                self._next_frame = time.perf_counter()
+
+        t = time.perf_counter() - self._start
+        pose = self._pose(t)
+
+        # A wrist occasionally leaves the image to exercise bounds checks
+        if self.rng.random() < self.off_frame_rate:
+            x, y, d = pose[15]
+            pose[15] = (x - 0.6, y, d)
+
+        depth = np.full((self.height, self.width), 4.0, dtype=np.float32)
+        depth += self._noise[self.frame_count % len(self._noise)]
+        color = self._background.copy()
+
+        occluded = self.rng.random(NUM_LANDMARKS) < self.occlusion_rate
+        for jid, (x, y, d) in enumerate(pose):
+            px, py = int(x * self.width), int(y * self.height)
+            if not (0 <= px < self.width and 0 <= py < self.height):
+                continue
+            y0, y1 = max(py - 4, 0), min(py + 5, self.height)
+            x0, x1 = max(px - 4, 0), min(px + 5, self.width)
+            # Occluded joints read as invalid (0.0) depth, like RealSense holes
+            depth[y0:y1, x0:x1] = 0.0 if occluded[jid] else d + self._noise[0, y0:y1, x0:x1]
+            cv2.circle(color, (px, py), 4, (200, 200, 200), -1)
+
+        self.landmarks = pose
+        self.frame_count += 1
+        return color, _SyntheticDepthFrame(depth, self.profile)
+
+    def stop(self):
+        """Match the `RealSenseCamera` interface; nothing to release."""
+        if self.verbose:
+            logger.info(f"Synthetic camera stopped after {self.frame_count} frames.")
+
+
+class SyntheticPoseEstimator:
+    """Report a `SyntheticCamera`'s ground-truth skeleton as pose results.
+
+    `extra_joints` landmarks with ids beyond Mediapipe's 33 are reported
+    per frame, drawn from a pool of `extra_id_pool` ids that rotates
+    every frame. Ids not active in a frame are placed outside the image
+    so the runner skips them. New ids therefore keep arriving until the
+    whole pool has been seen, driving the `KalmanSmoother` lazy
+    initialization path throughout the run rather than once.
+    """
+
+    def __init__(self, camera, extra_joints=0, extra_id_pool=None):
+        self.camera = camera
+        self.extra_joints = extra_joints
+        self.extra_id_pool = max(extra_id_pool or extra_joints, extra_joints)
+
+    def estimate(self, image):
+        """Return a Mediapipe-like results object for the current frame."""
+        pose = self.camera.landmarks
+        if not pose:
+            return None
+        landmarks = [SimpleNamespace(x=x, y=y, z=0.0, visibility=1.0) for x, y, _ in pose]
+        if self.extra_id_pool:
+            # Rotate which pool ids are active; inactive ones sit off-frame
+            start = self.camera.frame_count % self.extra_id_pool
+            active = {(start + i) % self.extra_id_pool for i in range(self.extra_joints)}
+            for i in range(self.extra_id_pool):
+                # Active extra joints sit next to the hips so they get valid depth
+                x, y, _ = pose[23 + i % 2]
+                if i not in active:
+                    x = -1.0
+                landmarks.append(SimpleNamespace(x=x, y=y, z=0.0, visibility=1.0))
+        return SimpleNamespace(pose_landmarks=SimpleNamespace(landmark=landmarks))
+
+    def draw_landmarks(self, image, results):
+        """Draw landmark markers in-place and return the image."""
+        if results and results.pose_landmarks:
+            h, w = image.shape[:2]
+            for lm in results.pose_landmarks.landmark:
+                cv2.circle(image, (int(lm.x * w), int(lm.y * h)), 3, (0, 0, 255), -1)
+        return image
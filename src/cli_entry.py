@@ -41,11 +41,45 @@ def main():
         help="Pose model complexity: 0 (lite), 1 (full), 2 (heavy)",
     )
 
+    # Optional annotated video output, encoded in a background process
+    parser.add_argument(
+        "--record-video",
+        metavar="PATH",
+        default=None,
+        help="Save the annotated skeleton video to PATH"
+    )
+    parser.add_argument(
+        "--video-codec",
+        default="mp4v",
+        help="FourCC codec for the recorded video (default: mp4v)"
+    )
+    parser.add_argument(
+        "--video-bitrate",
+        type=int,
+        default=None,
+        help="Target video bitrate in kbit/s; encodes via the ffmpeg executable"
+    )
+    parser.add_argument(
+        "--video-fps",
+        type=float,
+        default=None,
+        help="Capture rate used for the recorded video (default: camera rate)"
+    )
+    parser.add_argument(
+        "--video-decimation",
+        type=int,
+        default=1,
+        help="Record every Nth frame (default: 1, every frame)"
+    )
+
     args = parser.parse_args()
 
     # Call the main run loop with parsed options. Keep the call compact
     # so the CLI file remains a thin wrapper around the system core.
-    run_system(use_kalman=args.use_kalman, show_depth=args.show_depth, show_angles=args.show_angles, model=args.model)
+    run_system(use_kalman=args.use_kalman, show_depth=args.show_depth, show_angles=args.show_angles, model=args.model,
+               record_video=args.record_video, video_codec=args.video_codec,
+               video_bitrate=args.video_bitrate, video_decimation=args.video_decimation,
+               video_fps=args.video_fps)
 
 
 if __name__ == "__main__":
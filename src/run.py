@@ -2,49 +2,101 @@
 
 This module wires together the camera, pose estimator, optional
 Kalman smoother, angle calculator and CSV logger. It keeps the
-main loop simple and focuses on orchestrating data flow.
+main loop simple and focuses on orchestrating data flow; per-frame
+consumers such as the CSV logger are fed through a `FrameBus` so they
+run off the capture thread.
 """
 
 import cv2
+import time
 import logging
+from datetime import datetime
 from src.camera.realsense_camera import RealSenseCamera
 from src.pose.pose_estimator import PoseEstimator
 from src.filters.kalman_smoother import KalmanSmoother
-from src.utils.helpers import get_mean_depth, deproject
+from src.utils.helpers import get_mean_depth
+from src.utils.deprojection import DeprojectionCache
 
 from src.utils.angle_calculator import AngleCalculator
 from src.utils.csv_writer import CSVLogger
+from src.utils.frame_bus import FrameBus, BLOCK
+from src.utils.video_recorder import VideoRecorder
 
 
-def run_system(use_kalman=True, show_depth=False, show_angles=False, model=1):
+def run_system(use_kalman=True, show_depth=False, show_angles=False, model=1, frame_bus=None,
+               record_video=None, video_codec='mp4v', video_bitrate=None, video_decimation=1,
+               video_fps=None,
+               camera=None, pose_estimator=None, kalman=None, csv_path=None,
+               display=True, stop_event=None):
     """Main function to run the full system.
 
     Parameters mirror the CLI flags and allow programmatic control in
-    addition to the command line.
+    addition to the command line. `frame_bus` may be a `FrameBus` with
+    extra consumers already registered; the CSV logger is added to it for
+    the duration of the run and removed again on exit, while closing the
+    caller's bus remains the caller's job.
+    `record_video` is an optional output path for the annotated video,
+    encoded in a background process (see `VideoRecorder`); its frame rate
+    defaults to the camera's.
+
+    `camera`, `pose_estimator` and `kalman` replace the default
+    components (e.g. with the synthetic source used by `src.soak`),
+    `csv_path` overrides the CSV filename, `display=False` runs without
+    an OpenCV window and `stop_event` (a `threading.Event`) ends the loop
+    when set.
     """
 
     logging.info("Initializing camera...")
 
     # Initialize objects
-    cam = RealSenseCamera(verbose=True)
-    pose_est = PoseEstimator(model)
-    kalman = KalmanSmoother() if use_kalman else None
+    cam = camera if camera is not None else RealSenseCamera(verbose=True)
+    pose_est = pose_estimator if pose_estimator is not None else PoseEstimator(model)
+    if use_kalman and kalman is None:
+        kalman = KalmanSmoother()
 
     angle_calc = AngleCalculator()
-    logger = CSVLogger()
+    deproj_cache = DeprojectionCache()
 
-    logging.info(f"Kalman filter {'ENABLED' if use_kalman else 'DISABLED'}")
+    owns_bus = frame_bus is None
+    bus = FrameBus() if owns_bus else frame_bus
+    csv_consumer = None
+    recorder = None
 
     try:
-        while True:
+        # Built inside the try so a bad option still stops the camera.
+        # CSV rows are the primary data record, so block rather than drop;
+        # the generous queue absorbs disk stalls without slowing capture.
+        csv_logger = CSVLogger(csv_path)
+        try:
+            csv_consumer = bus.register(csv_logger, maxsize=256, policy=BLOCK)
+        except Exception:
+            # Not handed to a worker, so nobody else will close the file
+            csv_logger.close()
+            raise
+
+        if record_video:
+            fps = video_fps or getattr(cam, 'fps', None) or 30
+            size = (getattr(cam, 'width', None), getattr(cam, 'height', None))
+            # Start the encoder before capture begins when the frame size is known
+            recorder = VideoRecorder(record_video, fps=fps, codec=video_codec,
+                                     bitrate=video_bitrate, decimation=video_decimation,
+                                     frame_size=size if None not in size else None)
+
+        logging.info(f"Kalman filter {'ENABLED' if use_kalman else 'DISABLED'}")
+
+        while stop_event is None or not stop_event.is_set():
             # Get synchronized color image and depth frame from camera
             color_image, depth_frame = cam.get_frames()
             if color_image is None:
                 # skip iteration if frames were not available
                 continue
 
+            timestamp = datetime.now()
+            # Monotonic capture time for latency measurement by consumers
+            capture_time = time.perf_counter()
             h, w, _ = color_image.shape
-            depth_intrin = depth_frame.profile.as_video_stream_profile().intrinsics
+            # Ray table is rebuilt only when the depth stream profile changes
+            ray_table = deproj_cache.get(depth_frame)
 
             # Pose estimation on the latest color frame
             results = pose_est.estimate(color_image)
@@ -53,6 +105,7 @@ def run_system(use_kalman=True, show_depth=False, show_angles=False, model=1):
             # Extract 3D coordinates for detected landmarks
             landmarks_dict = {}
             if results and results.pose_landmarks:
+                ids, pxs, pys, depths = [], [], [], []
                 for id, lm in enumerate(results.pose_landmarks.landmark):
                     px, py = int(lm.x * w), int(lm.y * h)
                     if not (0 <= px < w and 0 <= py < h):
@@ -63,13 +116,15 @@ def run_system(use_kalman=True, show_depth=False, show_angles=False, model=1):
                     if depth is None:
                         continue
 
-                    # Convert pixel+depth to 3D camera coordinates. `deproject`
-                    # may return None on failure, so guard against that.
-                    xyz = deproject(depth_intrin, px, py, depth)
-                    if xyz is None:
-                        continue
-                    X, Y, Z = xyz
+                    ids.append(id)
+                    pxs.append(px)
+                    pys.append(py)
+                    depths.append(depth)
+
+                # Convert all pixel+depth pairs to 3D camera coordinates at once
+                points = ray_table.deproject(pxs, pys, depths).tolist() if ids else []
 
+                for id, px, py, (X, Y, Z) in zip(ids, pxs, pys, points):
                     # Optionally smooth using Kalman filter per-joint
                     if use_kalman and kalman:
                         X, Y, Z = kalman.update(id, X, Y, Z)
@@ -87,8 +142,13 @@ def run_system(use_kalman=True, show_depth=False, show_angles=False, model=1):
                 # Calculate joint angles from 3D landmarks
                 angles = angle_calc.calculate(landmarks_dict)
 
-                # Log angles to CSV for later analysis
-                logger.log(angles)
+                # Hand results to registered consumers (CSV logger etc.)
+                bus.publish({
+                    'timestamp': timestamp,
+                    'capture_time': capture_time,
+                    'landmarks': landmarks_dict,
+                    'angles': angles,
+                })
 
                 if show_angles:
                     # Overlay angles on the image for selected joints
@@ -107,20 +167,33 @@ def run_system(use_kalman=True, show_depth=False, show_angles=False, model=1):
                                         cv2.FONT_HERSHEY_SIMPLEX,
                                         0.5, (0, 255, 0), 2, cv2.LINE_AA)
 
-            # Display skeleton
-            cv2.imshow("3D Pose Skeleton", annotated_image)
+            # Queue the annotated frame for the background encoder
+            if recorder:
+                recorder.write(annotated_image, timestamp)
+
+            if display:
+                # Display skeleton
+                cv2.imshow("3D Pose Skeleton", annotated_image)
 
-            # Exit on ESC
-            if cv2.waitKey(1) & 0xFF == 27:
-                break
+                # Exit on ESC
+                if cv2.waitKey(1) & 0xFF == 27:
+                    break
 
     except KeyboardInterrupt:
         logging.info("Interrupted by user. Shutting down.")
 
     finally:
-        logger.close()
+        # Only shut down a bus we created; a caller's bus keeps its consumers
+        if owns_bus:
+            bus.close()
+        elif csv_consumer is not None:
+            bus.unregister(csv_consumer)
+        if recorder:
+            recorder.close()
+        deproj_cache.close()
         cam.stop()
-        cv2.destroyAllWindows()
+        if display:
+            cv2.destroyAllWindows()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,370 @@
+"""Long-running soak and throughput harness for the full pipeline.
+
+Drives `run_system` headless from `SyntheticCamera` for a fixed
+duration and samples, at a regular interval: throughput, capture-to-
+consumer latency percentiles, process RSS, tracemalloc totals and top
+growing allocators, CSV file size, Kalman filter count and frame-bus
+queue stats. At the end the run fails if memory keeps growing, if
+throughput or latency degrade between the start and the end of the
+run, if Kalman filters are not created for (or grow beyond) the joint
+ids in use, or if the CSV log lost rows or its bytes per row drifted.
+
+Example (an 8-hour station day at twice the camera rate)::
+
+    ost-soak --duration 28800 --fps 60 --report soak.json
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import logging
+import tempfile
+import threading
+import tracemalloc
+from collections import deque
+from datetime import datetime
+
+import numpy as np
+
+from src.run import run_system
+from src.camera.synthetic_camera import SyntheticCamera, SyntheticPoseEstimator, NUM_LANDMARKS
+from src.filters.kalman_smoother import KalmanSmoother
+from src.utils.frame_bus import FrameBus, FrameConsumer, BLOCK
+
+logger = logging.getLogger(__name__)
+
+
+def _rss_bytes():
+    """Current resident set size of this process, or None if unavailable."""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        # Peak rather than current RSS; kB on Linux, bytes on macOS
+        import resource
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return rss if sys.platform == 'darwin' else rss * 1024
+    except ImportError:
+        return None
+
+
+class _SoakProbe(FrameConsumer):
+    """Frame-bus consumer that counts frames and records their latency."""
+
+    name = 'soak-probe'
+
+    def __init__(self, window=100000):
+        self.lock = threading.Lock()
+        self.count = 0
+        self.latencies = deque(maxlen=window)
+
+    def consume(self, frame):
+        # Monotonic clock: wall-clock adjustments must not skew latency
+        latency = time.perf_counter() - frame['capture_time']
+        with self.lock:
+            self.count += 1
+            self.latencies.append(latency)
+
+    def drain(self):
+        """Return (frame count, latencies since the last drain)."""
+        with self.lock:
+            latencies = list(self.latencies)
+            self.latencies.clear()
+            return self.count, latencies
+
+
+class SoakHarness:
+    """Run the pipeline from a synthetic source and watch it over time.
+
+    Parameters
+    - duration: Run length in seconds.
+    - interval: Seconds between metric samples.
+    - fps: Synthetic frame rate; 0 runs unthrottled (over-rate stress).
+    - extra_joints: Landmarks beyond 33 reported per frame, exercising
+      lazy Kalman filters.
+    - extra_id_pool: Ids the extra landmarks rotate through; the Kalman
+      filter count must grow to exactly 33 + pool and no further.
+    - warmup: Fraction of the run ignored when evaluating trends.
+    - max_mem_growth_mb_per_hour: Allowed RSS slope after warm-up.
+    - min_slope_span: Seconds of post-warm-up samples needed before the
+      RSS slope is checked; shorter runs instead compare absolute growth
+      with what the slope limit allows over this span, so warm-up
+      allocations are not extrapolated to an hourly rate.
+    - max_throughput_drop: Allowed fractional drop in throughput from the
+      first to the last third of the run.
+    - max_latency_growth: Allowed ratio of late to early p95 latency.
+    - max_csv_row_growth: Allowed ratio of late to early CSV bytes per row.
+    - trace_top: Number of top growing allocators recorded per snapshot;
+      0 disables tracemalloc.
+    """
+
+    def __init__(self, duration=600, interval=5.0, fps=30, use_kalman=True,
+                 extra_joints=4, extra_id_pool=16, depth_noise=0.005,
+                 occlusion_rate=0.02, csv_path=None, warmup=0.1,
+                 max_mem_growth_mb_per_hour=50.0, min_slope_span=600.0,
+                 max_throughput_drop=0.2, max_latency_growth=1.5,
+                 max_csv_row_growth=1.5, trace_top=5, seed=0):
+        self.duration = duration
+        self.interval = interval
+        self.fps = fps
+        self.use_kalman = use_kalman
+        self.extra_joints = extra_joints
+        self.extra_id_pool = max(extra_id_pool, extra_joints)
+        self.warmup = warmup
+        self.max_mem_growth_mb_per_hour = max_mem_growth_mb_per_hour
+        self.min_slope_span = min_slope_span
+        self.max_throughput_drop = max_throughput_drop
+        self.max_latency_growth = max_latency_growth
+        self.max_csv_row_growth = max_csv_row_growth
+        self.trace_top = trace_top
+
+        if csv_path is None:
+            csv_path = os.path.join(tempfile.gettempdir(),
+                                    f"soak_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv")
+        self.csv_path = csv_path
+
+        self.camera = SyntheticCamera(fps=fps, depth_noise=depth_noise,
+                                      occlusion_rate=occlusion_rate, seed=seed)
+        self.pose_estimator = SyntheticPoseEstimator(self.camera, extra_joints=extra_joints,
+                                                     extra_id_pool=self.extra_id_pool)
+        self.kalman = KalmanSmoother() if use_kalman else None
+        self.bus = FrameBus()
+        self.probe = _SoakProbe()
+        self.bus.register(self.probe, maxsize=256, policy=BLOCK)
+
+        self.samples = []
+        self.failures = []
+        self._csv_rows_before = self._csv_rows()
+        self._stop = threading.Event()
+        self._baseline_snapshot = None
+
+    def _csv_rows(self):
+        """Number of data rows currently in the CSV file."""
+        if not os.path.exists(self.csv_path):
+            return 0
+        with open(self.csv_path) as f:
+            return max(sum(1 for _ in f) - 1, 0)
+
+    def _sample(self, start, last_time, last_count):
+        """Collect one metrics sample; returns (now, frame count)."""
+        now = time.perf_counter()
+        count, latencies = self.probe.drain()
+        elapsed = now - start
+        window = now - last_time
+
+        sample = {
+            'elapsed_s': round(elapsed, 3),
+            'frames': count,
+            'throughput_fps': (count - last_count) / window if window > 0 else 0.0,
+            'rss_mb': None,
+            'csv_bytes': os.path.getsize(self.csv_path) if os.path.exists(self.csv_path) else 0,
+            'kalman_filters': len(self.kalman.filters) if self.kalman else 0,
+            'bus': self.bus.stats(),
+        }
+        if latencies:
+            p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+            sample.update(latency_p50_ms=p50 * 1e3, latency_p95_ms=p95 * 1e3,
+                          latency_p99_ms=p99 * 1e3)
+
+        rss = _rss_bytes()
+        if rss is not None:
+            sample['rss_mb'] = rss / 2**20
+
+        if self.trace_top and tracemalloc.is_tracing():
+            current, peak = tracemalloc.get_traced_memory()
+            sample['traced_mb'] = current / 2**20
+            snapshot = tracemalloc.take_snapshot()
+            if self._baseline_snapshot is None:
+                self._baseline_snapshot = snapshot
+            stats = snapshot.compare_to(self._baseline_snapshot, 'lineno')
+            sample['top_growth'] = [str(stat) for stat in stats[:self.trace_top]]
+
+        self.samples.append(sample)
+        logger.info(f"[soak {elapsed:7.0f}s] {sample['throughput_fps']:.1f} fps, "
+                    f"p95 {sample.get('latency_p95_ms', float('nan')):.1f} ms, "
+                    f"rss {sample['rss_mb'] or float('nan'):.1f} MB, "
+                    f"csv {sample['csv_bytes'] / 2**20:.1f} MB")
+        return now, count
+
+    def _monitor(self):
+        """Sampler thread: record metrics every interval, stop at duration."""
+        start = last_time = time.perf_counter()
+        last_count = 0
+        while not self._stop.wait(self.interval):
+            last_time, last_count = self._sample(start, last_time, last_count)
+            if last_time - start >= self.duration:
+                self._stop.set()
+
+    def run(self):
+        """Run the soak test; returns True when every check passes."""
+        if self.trace_top:
+            tracemalloc.start()
+        monitor = threading.Thread(target=self._monitor, name="soak-monitor", daemon=True)
+        monitor.start()
+        try:
+            run_system(use_kalman=self.use_kalman, frame_bus=self.bus,
+                       camera=self.camera, pose_estimator=self.pose_estimator,
+                       kalman=self.kalman, csv_path=self.csv_path,
+                       display=False, stop_event=self._stop)
+        finally:
+            self._stop.set()
+            monitor.join()
+            # The harness owns its bus: drain the probe before evaluating
+            self.bus.close()
+            if tracemalloc.is_tracing():
+                tracemalloc.stop()
+
+        self._evaluate()
+        for failure in self.failures:
+            logger.error(f"Soak check failed: {failure}")
+        return not self.failures
+
+    def _evaluate(self):
+        """Apply the pass/fail checks to the collected samples."""
+        steady = self.samples[int(len(self.samples) * self.warmup):]
+
+        # Memory: RSS slope after warm-up must stay below the limit. Over a
+        # short span a few MB of one-off growth would extrapolate to a large
+        # hourly rate, so short runs get an absolute budget instead
+        rss = [(s['elapsed_s'], s['rss_mb']) for s in steady if s['rss_mb'] is not None]
+        if len(rss) >= 3 and rss[-1][0] - rss[0][0] >= self.min_slope_span:
+            seconds, mb = zip(*rss)
+            slope = np.polyfit(np.array(seconds) / 3600, mb, 1)[0]
+            if slope > self.max_mem_growth_mb_per_hour:
+                self.failures.append(f"RSS grows {slope:.1f} MB/h "
+                                     f"(limit {self.max_mem_growth_mb_per_hour} MB/h)")
+        elif len(rss) >= 2:
+            growth = rss[-1][1] - rss[0][1]
+            budget = self.max_mem_growth_mb_per_hour * self.min_slope_span / 3600
+            if growth > budget:
+                self.failures.append(f"RSS grew {growth:.1f} MB in {rss[-1][0] - rss[0][0]:.0f}s "
+                                     f"(limit {budget:.1f} MB)")
+
+        # Throughput and latency: compare the first and last third of the run
+        third = len(steady) // 3
+        if third >= 2:
+            early, late = steady[:third], steady[-third:]
+            early_fps = np.mean([s['throughput_fps'] for s in early])
+            late_fps = np.mean([s['throughput_fps'] for s in late])
+            if late_fps < early_fps * (1 - self.max_throughput_drop):
+                self.failures.append(f"Throughput fell from {early_fps:.1f} to {late_fps:.1f} fps")
+
+            early_p95 = [s['latency_p95_ms'] for s in early if 'latency_p95_ms' in s]
+            late_p95 = [s['latency_p95_ms'] for s in late if 'latency_p95_ms' in s]
+            if early_p95 and late_p95:
+                early_p95, late_p95 = np.median(early_p95), np.median(late_p95)
+                if late_p95 > early_p95 * self.max_latency_growth:
+                    self.failures.append(f"p95 latency rose from {early_p95:.1f} to {late_p95:.1f} ms")
+
+        # Kalman: the rotating extra ids must each get a lazily created
+        # filter, and the filter count must never exceed the ids in use
+        if self.kalman:
+            expected = NUM_LANDMARKS + self.extra_id_pool
+            peak = max([s['kalman_filters'] for s in self.samples] + [len(self.kalman.filters)])
+            if peak > expected:
+                self.failures.append(f"{peak} Kalman filters for {expected} joint ids")
+            elif self.extra_joints and self.camera.frame_count >= 4 * self.extra_id_pool \
+                    and len(self.kalman.filters) < expected:
+                self.failures.append(f"Only {len(self.kalman.filters)} of {expected} Kalman "
+                                     f"filters created; lazy initialization failed")
+
+        # CSV growth: bytes per row must stay stable across the run
+        per_row = []
+        for prev, cur in zip(steady, steady[1:]):
+            rows = cur['frames'] - prev['frames']
+            if rows > 0:
+                per_row.append((cur['csv_bytes'] - prev['csv_bytes']) / rows)
+        third = len(per_row) // 3
+        if third >= 2:
+            early_bpr = np.median(per_row[:third])
+            late_bpr = np.median(per_row[-third:])
+            if early_bpr <= 0 or late_bpr > early_bpr * self.max_csv_row_growth:
+                self.failures.append(f"CSV bytes per row went from {early_bpr:.1f} to {late_bpr:.1f}")
+
+        # CSV: every published frame must have been written
+        rows = self._csv_rows() - self._csv_rows_before
+        if rows != self.probe.count:
+            self.failures.append(f"CSV gained {rows} rows for {self.probe.count} frames")
+
+    def report(self):
+        """Return the run configuration, samples and failures as a dict."""
+        return {
+            'duration_s': self.duration,
+            'fps': self.fps,
+            'extra_joints': self.extra_joints,
+            'extra_id_pool': self.extra_id_pool,
+            'csv_path': self.csv_path,
+            'passed': not self.failures,
+            'failures': self.failures,
+            'samples': self.samples,
+        }
+
+
+def main():
+    """CLI arguments to run the soak test"""
+    parser = argparse.ArgumentParser(
+        description="Soak-test the OST pipeline with a synthetic camera"
+    )
+    parser.add_argument("--duration", type=float, default=600,
+                        help="Run length in seconds (default: 600)")
+    parser.add_argument("--interval", type=float, default=5.0,
+                        help="Seconds between metric samples (default: 5)")
+    parser.add_argument("--fps", type=float, default=30,
+                        help="Synthetic frame rate; 0 for unthrottled stress (default: 30)")
+    parser.add_argument("--extra-joints", type=int, default=4,
+                        help="Landmarks beyond 33 per frame to exercise lazy Kalman filters (default: 4)")
+    parser.add_argument("--extra-id-pool", type=int, default=16,
+                        help="Ids the extra landmarks rotate through (default: 16)")
+    parser.add_argument("--depth-noise", type=float, default=0.005,
+                        help="Depth noise standard deviation in meters (default: 0.005)")
+    parser.add_argument("--occlusion-rate", type=float, default=0.02,
+                        help="Per-joint probability of missing depth per frame (default: 0.02)")
+    parser.add_argument("--no-kalman", action="store_true",
+                        help="Disable Kalman smoothing")
+    parser.add_argument("--csv", default=None,
+                        help="CSV output path (default: temporary file)")
+    parser.add_argument("--report", default=None,
+                        help="Write the JSON report to this path")
+    parser.add_argument("--max-mem-growth", type=float, default=50.0,
+                        help="Allowed RSS growth in MB/hour (default: 50)")
+    parser.add_argument("--min-slope-span", type=float, default=600,
+                        help="Seconds after warm-up needed for the RSS slope check; shorter "
+                             "runs check absolute growth instead (default: 600)")
+    parser.add_argument("--max-throughput-drop", type=float, default=0.2,
+                        help="Allowed fractional throughput drop (default: 0.2)")
+    parser.add_argument("--max-latency-growth", type=float, default=1.5,
+                        help="Allowed ratio of late to early p95 latency (default: 1.5)")
+    parser.add_argument("--max-csv-row-growth", type=float, default=1.5,
+                        help="Allowed ratio of late to early CSV bytes per row (default: 1.5)")
+    parser.add_argument("--trace-top", type=int, default=5,
+                        help="Top tracemalloc allocators to record; 0 disables (default: 5)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+    harness = SoakHarness(duration=args.duration, interval=args.interval, fps=args.fps,
+                          use_kalman=not args.no_kalman, extra_joints=args.extra_joints,
+                          extra_id_pool=args.extra_id_pool,
+                          depth_noise=args.depth_noise, occlusion_rate=args.occlusion_rate,
+                          csv_path=args.csv, max_mem_growth_mb_per_hour=args.max_mem_growth,
+                          min_slope_span=args.min_slope_span,
+                          max_throughput_drop=args.max_throughput_drop,
+                          max_latency_growth=args.max_latency_growth,
+                          max_csv_row_growth=args.max_csv_row_growth,
+                          trace_top=args.trace_top)
+    passed = harness.run()
+
+    if args.report:
+        with open(args.report, 'w') as f:
+            json.dump(harness.report(), f, indent=2, default=str)
+
+    logger.info(f"Soak test {'PASSED' if passed else 'FAILED'}")
+    sys.exit(0 if passed else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -4,14 +4,19 @@ This utility opens a CSV file in append mode and writes a header the
 first time it runs. Each row contains an ISO timestamp followed by the
 angle values. The class keeps the file open to reduce IO overhead and
 flushes on each write to minimize data loss in case of a crash.
+
+`CSVLogger` is also a `FrameConsumer`, so it can be registered with a
+`FrameBus` and write rows on its own worker thread.
 """
 
 import csv
 import os
 from datetime import datetime
 
+from src.utils.frame_bus import FrameConsumer
+
 
-class CSVLogger:
+class CSVLogger(FrameConsumer):
     def __init__(self, filename=None):
         # Default filename includes a timestamp for uniqueness
         if filename is None:
@@ -30,16 +35,23 @@ class CSVLogger:
         else:
             self.writer = csv.DictWriter(self.file, fieldnames=['timestamp'] + keys)
 
-    def log(self, angles_dict):
+    def log(self, angles_dict, timestamp=None):
         # Lazily write header on first log call when angle keys are known
         if self.writer is None:
             self.write_header(list(angles_dict.keys()))
-        row = {'timestamp': datetime.now().isoformat()}
+        # Prefer the capture timestamp so queued rows keep their frame time
+        if timestamp is None:
+            timestamp = datetime.now()
+        row = {'timestamp': timestamp.isoformat()}
         row.update(angles_dict)
         self.writer.writerow(row)
         # Flush to keep the file consistent if the process stops unexpectedly
         self.file.flush()
 
+    def consume(self, frame):
+        # Frame results published by the runner carry angles + capture time
+        self.log(frame['angles'], frame.get('timestamp'))
+
     def close(self):
         # Close underlying file handle
         self.file.close()
@@ -0,0 +1,181 @@
+"""Cached intrinsics and a precomputed pixel-to-ray table for deprojection.
+
+`rs.rs2_deproject_pixel_to_point` undistorts the pixel on every call.
+Because the undistorted ray of a pixel depends only on the intrinsics,
+it can be computed once for every pixel of the stream: the result is an
+H x W x 2 table of normalized (x, y) ray coordinates, and deprojecting
+any set of pixels becomes a gather from the table times depth.
+
+The table mirrors librealsense's `rs2_deproject_pixel_to_point`
+(rsutil.h), including the iteration counts and float32 arithmetic, so
+the results match it numerically. It lives in shared memory and can be
+attached read-only from other processes with `RayTable.attach`.
+"""
+
+import logging
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+import pyrealsense2 as rs
+
+logger = logging.getLogger(__name__)
+
+_EPS = np.finfo(np.float32).eps
+
+
+def build_ray_table(intrin):
+    """Return an (H, W, 2) float32 array of undistorted rays for `intrin`.
+
+    Entry [v, u] holds (x, y) such that the 3D point at depth `d` for
+    pixel (u, v) is (x * d, y * d, d), exactly as librealsense computes it.
+    """
+    f32 = np.float32
+    c = [f32(k) for k in intrin.coeffs]
+    u = np.arange(intrin.width, dtype=f32)
+    v = np.arange(intrin.height, dtype=f32)
+    x = np.broadcast_to((u - f32(intrin.ppx)) / f32(intrin.fx), (intrin.height, intrin.width)).copy()
+    y = np.broadcast_to(((v - f32(intrin.ppy)) / f32(intrin.fy))[:, None], (intrin.height, intrin.width)).copy()
+    xo, yo = x.copy(), y.copy()
+
+    model = intrin.model
+    if model in (rs.distortion.inverse_brown_conrady, rs.distortion.brown_conrady):
+        # Fixed-point iteration; 10 iterations as in librealsense
+        inverse = model == rs.distortion.inverse_brown_conrady
+        for _ in range(10):
+            r2 = x * x + y * y
+            icdist = f32(1) / (f32(1) + ((c[4] * r2 + c[1]) * r2 + c[0]) * r2)
+            xq, yq = (x / icdist, y / icdist) if inverse else (x, y)
+            delta_x = f32(2) * c[2] * xq * yq + c[3] * (r2 + f32(2) * xq * xq)
+            delta_y = f32(2) * c[3] * xq * yq + c[2] * (r2 + f32(2) * yq * yq)
+            x = (xo - delta_x) * icdist
+            y = (yo - delta_y) * icdist
+
+    elif model == rs.distortion.kannala_brandt4:
+        # Newton's method on theta, up to 4 steps per pixel
+        rd = np.maximum(np.sqrt(x * x + y * y), _EPS)
+        theta = rd.copy()
+        theta2 = rd * rd
+        done = np.zeros(rd.shape, dtype=bool)
+        for _ in range(4):
+            f = theta * (f32(1) + theta2 * (c[0] + theta2 * (c[1] + theta2 * (c[2] + theta2 * c[3])))) - rd
+            done |= np.abs(f) < _EPS
+            df = f32(1) + theta2 * (f32(3) * c[0] + theta2 * (f32(5) * c[1] + theta2 * (f32(7) * c[2] + f32(9) * theta2 * c[3])))
+            theta = np.where(done, theta, theta - f / df)
+            theta2 = theta * theta
+        # librealsense calls the double tan() and truncates to float
+        r = np.tan(theta.astype(np.float64)).astype(f32)
+        x = x * (r / rd)
+        y = y * (r / rd)
+
+    elif model == rs.distortion.ftheta:
+        rd = np.maximum(np.sqrt(x * x + y * y), _EPS)
+        # librealsense evaluates the tangents in double precision
+        r = (np.tan((c[0] * rd).astype(np.float64))
+             / np.arctan(2 * np.tan(np.float64(c[0] / f32(2))))).astype(f32)
+        x = x * (r / rd)
+        y = y * (r / rd)
+
+    elif model == rs.distortion.modified_brown_conrady:
+        # librealsense cannot deproject a forward-distorted image either;
+        # like its release builds, fall through to the pinhole model.
+        logger.warning("Deprojecting modified Brown-Conrady intrinsics without undistortion")
+
+    return np.stack([x, y], axis=-1).astype(f32, copy=False)
+
+
+class RayTable:
+    """Pixel-to-ray lookup table backed by shared memory.
+
+    Create one with `from_intrinsics` in the owning process, or attach
+    to an existing table from another process with `attach`. The array
+    is exposed as `rays` with its writeable flag cleared; this only guards
+    against accidental writes through that array, as the shared buffer
+    underneath stays writable.
+    """
+
+    def __init__(self, shm, height, width, owner):
+        self.shm = shm
+        self.height = height
+        self.width = width
+        self._owner = owner
+        self.rays = np.ndarray((height, width, 2), dtype=np.float32, buffer=shm.buf)
+        self.rays.flags.writeable = False
+
+    @classmethod
+    def from_intrinsics(cls, intrin):
+        """Build the table for `intrin` into a new shared memory block."""
+        table = build_ray_table(intrin)
+        shm = shared_memory.SharedMemory(create=True, size=table.nbytes)
+        np.ndarray(table.shape, dtype=np.float32, buffer=shm.buf)[:] = table
+        return cls(shm, intrin.height, intrin.width, owner=True)
+
+    @classmethod
+    def attach(cls, name, height, width):
+        """Attach read-only to a table created in another process.
+
+        Only the owner may free the block, so the segment is unregistered
+        from this process's resource tracker, which would otherwise unlink
+        it when this process exits.
+        """
+        shm = shared_memory.SharedMemory(name=name)
+        resource_tracker.unregister(shm._name, "shared_memory")
+        return cls(shm, height, width, owner=False)
+
+    @property
+    def name(self):
+        """Shared memory name to pass to `attach` in another process."""
+        return self.shm.name
+
+    def deproject(self, px, py, depth):
+        """Vectorized deprojection of pixel arrays `px`, `py` at `depth` (m).
+
+        Returns an (N, 3) float32 array of camera-frame points, matching
+        `rs.rs2_deproject_pixel_to_point` for the same inputs.
+        """
+        depth = np.asarray(depth, dtype=np.float32)
+        rays = self.rays[np.asarray(py), np.asarray(px)]
+        return np.column_stack([rays * depth[:, None], depth])
+
+    def close(self):
+        """Release this process's mapping; the owner also frees the block."""
+        self.rays = None
+        self.shm.close()
+        if self._owner:
+            self.shm.unlink()
+
+
+class DeprojectionCache:
+    """Cache intrinsics and ray table per stream profile.
+
+    `get(depth_frame)` only fetches intrinsics and rebuilds the table
+    when the frame's stream profile changes, so steady-state frames
+    cost a single profile id lookup.
+    """
+
+    def __init__(self):
+        self.profile_id = None
+        self.intrinsics = None
+        self.table = None
+
+    def get(self, depth_frame):
+        """Return the `RayTable` for `depth_frame`'s stream profile."""
+        profile = depth_frame.profile
+        profile_id = profile.unique_id()
+        if profile_id != self.profile_id:
+            intrin = profile.as_video_stream_profile().intrinsics
+            if self.table is not None:
+                self.table.close()
+            self.table = RayTable.from_intrinsics(intrin)
+            self.intrinsics = intrin
+            self.profile_id = profile_id
+            logger.info(f"Built ray table for stream profile {profile_id} "
+                        f"({intrin.width}x{intrin.height}, {intrin.model})")
+        return self.table
+
+    def close(self):
+        """Free the cached ray table."""
+        if self.table is not None:
+            self.table.close()
+            self.table = None
+        self.profile_id = None
+        self.intrinsics = None
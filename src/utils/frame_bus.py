@@ -0,0 +1,209 @@
+"""Non-blocking fan-out of per-frame results to registered consumers.
+
+Consumers (loggers, analytics, network publishers, recorders) register
+with a `FrameBus` instead of being hardwired into the main loop. Each
+consumer gets its own bounded queue and worker thread so a slow
+consumer cannot stall frame capture; what happens when its queue is
+full is controlled by a per-consumer overflow policy.
+"""
+
+import time
+import queue
+import threading
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Overflow policies applied when a consumer's queue is full
+BLOCK = "block"              # wait for space (no data loss, may slow capture)
+DROP_OLDEST = "drop_oldest"  # discard the oldest queued frame to make room
+DROP_NEWEST = "drop_newest"  # discard the incoming frame
+
+POLICIES = (BLOCK, DROP_OLDEST, DROP_NEWEST)
+
+# Marker placed on a queue to tell its worker thread to exit
+_STOP = object()
+
+
+class FrameConsumer:
+    """Base class for objects that receive per-frame results from a `FrameBus`.
+
+    Subclasses implement `consume`, which is called on the consumer's own
+    worker thread, and may override `close` to release resources once
+    the queue has been drained.
+    """
+
+    # Name used in logs and stats; defaults to the class name
+    name = None
+
+    def consume(self, frame):
+        """Handle a single frame result (a dict published by the runner)."""
+        raise NotImplementedError
+
+    def close(self):
+        """Release resources. Called once on the worker thread at shutdown."""
+        pass
+
+
+class _ConsumerWorker:
+    """Bounded queue plus worker thread feeding a single consumer."""
+
+    def __init__(self, consumer, name, maxsize, policy):
+        self.consumer = consumer
+        self.name = name
+        self.policy = policy
+        self.queue = queue.Queue(maxsize=maxsize)
+        self.dropped = 0
+        self.processed = 0
+        self.errors = 0
+        self.thread = threading.Thread(
+            target=self._run, name=f"consumer-{name}", daemon=True
+        )
+        self.thread.start()
+
+    def put(self, frame):
+        """Enqueue `frame` according to the overflow policy."""
+        if self.policy == BLOCK:
+            self.queue.put(frame)
+            return
+
+        if self.policy == DROP_NEWEST:
+            try:
+                self.queue.put_nowait(frame)
+            except queue.Full:
+                self.dropped += 1
+            return
+
+        # DROP_OLDEST: evict from the head until the new frame fits. The
+        # worker may drain the queue concurrently, hence the loop.
+        while True:
+            try:
+                self.queue.put_nowait(frame)
+                return
+            except queue.Full:
+                try:
+                    self.queue.get_nowait()
+                    self.dropped += 1
+                except queue.Empty:
+                    pass
+
+    def stop(self, timeout=None):
+        """Ask the worker to drain its queue, close the consumer and exit.
+
+        Gives up after `timeout` seconds: a consumer that is stuck is
+        logged and its daemon worker abandoned so shutdown can proceed.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        try:
+            self.queue.put(_STOP, timeout=timeout)
+        except queue.Full:
+            if self.policy == BLOCK:
+                logger.warning(f"Consumer '{self.name}' is stuck with a full queue; "
+                               f"abandoning its worker")
+                return
+            # Drop policies may lose frames anyway: evict to make room
+            while True:
+                try:
+                    self.queue.put_nowait(_STOP)
+                    break
+                except queue.Full:
+                    try:
+                        self.queue.get_nowait()
+                        self.dropped += 1
+                    except queue.Empty:
+                        pass
+
+        remaining = None if deadline is None else max(deadline - time.monotonic(), 0)
+        self.thread.join(remaining)
+        if self.thread.is_alive():
+            logger.warning(f"Consumer '{self.name}' did not stop within {timeout}s; "
+                           f"abandoning its worker")
+
+    def stats(self):
+        return {
+            'depth': self.queue.qsize(),
+            'dropped': self.dropped,
+            'processed': self.processed,
+            'errors': self.errors,
+        }
+
+    def _run(self):
+        while True:
+            frame = self.queue.get()
+            if frame is _STOP:
+                break
+            try:
+                self.consumer.consume(frame)
+                self.processed += 1
+            except Exception:
+                # Keep the worker alive; a bad frame should not kill the consumer
+                self.errors += 1
+                logger.exception(f"Error in consumer '{self.name}':")
+
+        try:
+            self.consumer.close()
+        except Exception:
+            logger.exception(f"Error closing consumer '{self.name}':")
+
+
+class FrameBus:
+    """Fan out frame results to registered consumers without blocking capture."""
+
+    def __init__(self):
+        # Guards `_workers`; stats() may be polled from other threads
+        self._lock = threading.Lock()
+        self._workers = {}
+
+    def register(self, consumer, maxsize=64, policy=DROP_OLDEST, name=None):
+        """Attach `consumer` with its own queue of `maxsize` frames.
+
+        `policy` is one of `BLOCK`, `DROP_OLDEST` or `DROP_NEWEST`. Returns
+        the name under which the consumer is registered.
+        """
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown overflow policy: {policy!r}")
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1")
+
+        name = name or getattr(consumer, 'name', None) or type(consumer).__name__
+        with self._lock:
+            if name in self._workers:
+                raise ValueError(f"Consumer '{name}' is already registered")
+            self._workers[name] = _ConsumerWorker(consumer, name, maxsize, policy)
+        return name
+
+    def unregister(self, name, timeout=5.0):
+        """Drain, close and detach the consumer registered as `name`."""
+        with self._lock:
+            worker = self._workers.pop(name)
+        worker.stop(timeout)
+        s = worker.stats()
+        logger.info(f"Consumer '{name}': processed={s['processed']} "
+                    f"dropped={s['dropped']} errors={s['errors']}")
+
+    def publish(self, frame):
+        """Hand `frame` to every registered consumer."""
+        with self._lock:
+            workers = list(self._workers.values())
+        for worker in workers:
+            worker.put(frame)
+
+    def stats(self):
+        """Return a dict of consumer name -> queue depth and counters."""
+        with self._lock:
+            workers = list(self._workers.items())
+        return {name: worker.stats() for name, worker in workers}
+
+    def close(self, timeout=5.0):
+        """Drain all queues, close every consumer and stop worker threads.
+
+        `timeout` applies per consumer; stuck consumers are abandoned.
+        """
+        with self._lock:
+            workers = list(self._workers.items())
+            self._workers.clear()
+        for name, worker in workers:
+            worker.stop(timeout)
+            s = worker.stats()
+            logger.info(f"Consumer '{name}': processed={s['processed']} "
+                        f"dropped={s['dropped']} errors={s['errors']}")
@@ -70,7 +70,8 @@ def deproject(depth_intrin, px, py, depth):
       or `None` if deprojection fails.
 
     This is a thin wrapper around `rs.rs2_deproject_pixel_to_point` that
-    centralizes error handling for callers.
+    centralizes error handling for callers. For many pixels per frame
+    prefer `src.utils.deprojection.RayTable`, which precomputes the rays.
     """
     try:
         # rs2_deproject_pixel_to_point expects the pixel as a two-element
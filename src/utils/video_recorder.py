@@ -0,0 +1,316 @@
+"""Annotated-video recording offloaded to a background encoder process.
+
+The capture loop copies each kept frame into a slot of a bounded
+shared-memory ring buffer and hands the slot index (plus the frame's
+capture timestamp) to a separate process that encodes it with
+`cv2.VideoWriter`, or with an `ffmpeg` subprocess when a target bitrate
+is requested. When every slot is busy because the encoder has
+fallen behind, the frame is dropped and counted instead of stalling
+capture.
+
+Next to the video a `<name>.timestamps.csv` sidecar is written with one
+row per encoded frame so the video can be matched to the CSV data.
+"""
+
+import csv
+import os
+import time
+import queue
+import shutil
+import logging
+import subprocess
+import multiprocessing as mp
+from multiprocessing import shared_memory
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# FourCC -> (ffmpeg encoder, extra args) for bitrate-controlled recording.
+# cv2.VideoWriter offers no bitrate control, so these go through ffmpeg.
+FFMPEG_CODECS = {
+    'mp4v': ('mpeg4', []),
+    'XVID': ('mpeg4', ['-vtag', 'xvid']),
+    'MJPG': ('mjpeg', []),
+    'avc1': ('libx264', ['-pix_fmt', 'yuv420p']),
+    'H264': ('libx264', ['-pix_fmt', 'yuv420p']),
+}
+
+
+class _FFmpegWriter:
+    """Minimal `cv2.VideoWriter` look-alike that pipes raw BGR frames to ffmpeg."""
+
+    def __init__(self, filename, codec, fps, size, bitrate):
+        encoder, extra = FFMPEG_CODECS[codec]
+        w, h = size
+        cmd = ['ffmpeg', '-loglevel', 'error', '-y',
+               '-f', 'rawvideo', '-pix_fmt', 'bgr24', '-s', f"{w}x{h}", '-r', str(fps),
+               '-i', '-', '-c:v', encoder, '-b:v', f"{int(bitrate)}k", *extra, filename]
+        try:
+            self.proc = subprocess.Popen(cmd, stdin=subprocess.PIPE)
+        except OSError:
+            logger.exception("Could not start ffmpeg:")
+            self.proc = None
+
+    def isOpened(self):
+        return self.proc is not None and self.proc.poll() is None
+
+    def write(self, frame):
+        # Raises BrokenPipeError if ffmpeg has exited (e.g. bad output path)
+        self.proc.stdin.write(frame.data)
+
+    def release(self):
+        if self.proc is None:
+            return True
+        try:
+            self.proc.stdin.close()
+        except BrokenPipeError:
+            pass
+        return self.proc.wait() == 0
+
+
+def _encoder_main(shm_name, shape, slots, free_slots, ready, written, failed,
+                  started, filename, codec, fps, bitrate):
+    """Encoder process: pull filled slots, write them, then free the slots."""
+    h, w = shape[:2]
+    if bitrate:
+        writer = _FFmpegWriter(filename, codec, fps, (w, h), bitrate)
+    else:
+        import cv2
+        writer = cv2.VideoWriter(filename, cv2.VideoWriter_fourcc(*codec), fps, (w, h))
+
+    ts_path = os.path.splitext(filename)[0] + '.timestamps.csv'
+    try:
+        if not writer.isOpened():
+            raise OSError(f"could not open video writer ({codec})")
+        ts_file = open(ts_path, 'w', newline='')
+    except OSError:
+        # Flag the failure so the capture process stops offering frames
+        logger.exception(f"Cannot record video to {filename}:")
+        writer.release()
+        failed.value = 1
+        started.set()
+        return
+
+    shm = shared_memory.SharedMemory(name=shm_name)
+    frames = np.ndarray((slots,) + shape, dtype=np.uint8, buffer=shm.buf)
+
+    ts_writer = csv.writer(ts_file)
+    ts_writer.writerow(['frame', 'timestamp'])
+    started.set()
+
+    try:
+        while True:
+            item = ready.get()
+            if item is None:
+                break
+            slot, timestamp = item
+            try:
+                writer.write(frames[slot])
+                ts_writer.writerow([written.value, timestamp])
+                written.value += 1
+            except BrokenPipeError:
+                logger.error(f"ffmpeg exited while recording {filename}")
+                failed.value = 1
+                break
+            except Exception:
+                logger.exception("Error encoding video frame:")
+            finally:
+                # Hand the slot back to the capture process
+                free_slots.put(slot)
+    finally:
+        if writer.release() is False:
+            logger.error(f"ffmpeg failed to finish {filename}")
+            failed.value = 1
+        ts_file.close()
+        del frames
+        shm.close()
+
+
+class VideoRecorder:
+    """Record annotated frames to a video file without blocking capture.
+
+    Parameters
+    - filename: Output video path.
+    - fps: Capture frame rate; the video is written at `fps / decimation`.
+    - codec: FourCC code passed to `cv2.VideoWriter` (e.g. 'mp4v', 'XVID').
+    - bitrate: Target bitrate in kbit/s, or None for the codec default.
+      Setting it encodes through an `ffmpeg` subprocess instead of
+      `cv2.VideoWriter`, which has no bitrate control; it requires ffmpeg
+      on the PATH and a codec listed in `FFMPEG_CODECS`.
+    - decimation: Keep every Nth frame offered to `write`.
+    - slots: Number of frames the shared buffer can hold.
+    - frame_size: (width, height) of the frames, if known. The encoder is
+      then started here rather than on the first `write`.
+    - startup_timeout: Seconds to wait for the encoder to become ready.
+
+    The encoder process is spawned, which re-imports the application's
+    main module and can take seconds; starting it blocks until the
+    encoder is ready so the first frames of a recording are not dropped.
+    """
+
+    def __init__(self, filename, fps=30, codec='mp4v', bitrate=None,
+                 decimation=1, slots=8, frame_size=None, startup_timeout=60.0):
+        if decimation < 1:
+            raise ValueError("decimation must be at least 1")
+        if slots < 1:
+            raise ValueError("slots must be at least 1")
+        if len(codec) != 4:
+            raise ValueError(f"codec must be a 4-character FourCC, got {codec!r}")
+        if bitrate is not None:
+            if bitrate <= 0:
+                raise ValueError("bitrate must be positive")
+            if codec not in FFMPEG_CODECS:
+                raise ValueError(f"bitrate is only supported for codecs "
+                                 f"{sorted(FFMPEG_CODECS)}, got {codec!r}")
+            if shutil.which('ffmpeg') is None:
+                raise ValueError("bitrate requires ffmpeg on the PATH")
+
+        self.filename = filename
+        self.fps = fps / decimation
+        self.codec = codec
+        self.bitrate = bitrate
+        self.decimation = decimation
+        self.slots = slots
+        self.startup_timeout = startup_timeout
+
+        self.offered = 0
+        self.dropped = 0
+        self.shape = None
+        self._failure_reported = False
+
+        # Buffer and encoder are created on the first frame, once the size is known
+        self._shm = None
+        self._frames = None
+        self._process = None
+        self._free_slots = None
+        self._ready = None
+        self._written = None
+        self._failed = None
+        self._started = None
+
+        if frame_size is not None:
+            w, h = frame_size
+            self._start((h, w, 3))
+
+    def _start(self, shape):
+        """Allocate the shared ring buffer and launch the encoder process."""
+        self.shape = shape
+        size = int(np.prod(shape)) * self.slots
+        self._shm = shared_memory.SharedMemory(create=True, size=size)
+        self._frames = np.ndarray((self.slots,) + shape, dtype=np.uint8, buffer=self._shm.buf)
+
+        # Spawn rather than fork: the capture process already runs threads
+        # (frame bus workers) whose locks a forked child could inherit held
+        ctx = mp.get_context('spawn')
+        self._free_slots = ctx.Queue()
+        self._ready = ctx.Queue()
+        self._written = ctx.Value('i', 0)
+        self._failed = ctx.Value('b', 0)
+        self._started = ctx.Event()
+        for slot in range(self.slots):
+            self._free_slots.put(slot)
+
+        self._process = ctx.Process(
+            target=_encoder_main,
+            args=(self._shm.name, shape, self.slots, self._free_slots, self._ready,
+                  self._written, self._failed, self._started, self.filename,
+                  self.codec, self.fps, self.bitrate),
+            name="video-encoder",
+            daemon=True,
+        )
+        self._process.start()
+
+        # Wait for the encoder so frames are not dropped while it starts,
+        # giving up early if the encoder process dies before it is ready
+        deadline = time.monotonic() + self.startup_timeout
+        while not self._started.wait(0.1):
+            if not self._process.is_alive():
+                self._failed.value = 1
+                break
+            if time.monotonic() > deadline:
+                break
+
+        if self.failed:
+            logger.error(f"Video encoder failed; not recording {self.filename}")
+            self._failure_reported = True
+        elif not self._started.is_set():
+            logger.warning(f"Video encoder not ready after {self.startup_timeout}s; "
+                           f"frames will be dropped until it is")
+        else:
+            logger.info(f"Recording video to {self.filename} "
+                        f"({self.codec}, {self.fps:.1f} fps, decimation {self.decimation})")
+
+    @property
+    def failed(self):
+        """True once the encoder has reported that it cannot write the video."""
+        return self._failed is not None and bool(self._failed.value)
+
+    def write(self, image, timestamp):
+        """Offer an annotated BGR frame captured at `timestamp` (datetime).
+
+        Returns True if the frame was queued for encoding, False if it was
+        skipped by decimation, dropped because the encoder is behind, or
+        the encoder failed to open the output.
+        """
+        index = self.offered
+        self.offered += 1
+        if index % self.decimation:
+            return False
+
+        if self._process is None:
+            self._start(image.shape)
+        if self.failed:
+            if not self._failure_reported:
+                logger.error(f"Video encoder failed; not recording {self.filename}")
+                self._failure_reported = True
+            self.dropped += 1
+            return False
+        if image.shape != self.shape:
+            logger.warning(f"Frame shape {image.shape} does not match video {self.shape}; dropping")
+            self.dropped += 1
+            return False
+
+        try:
+            slot = self._free_slots.get_nowait()
+        except queue.Empty:
+            # Encoder has every slot: drop rather than stall the capture loop
+            self.dropped += 1
+            return False
+
+        self._frames[slot] = image
+        self._ready.put((slot, timestamp.isoformat()))
+        return True
+
+    def stats(self):
+        """Return counters for frames offered, encoded and dropped."""
+        return {
+            'offered': self.offered,
+            'written': self._written.value if self._written is not None else 0,
+            'dropped': self.dropped,
+            'failed': self.failed,
+        }
+
+    def close(self, timeout=10.0):
+        """Flush queued frames, stop the encoder and release shared memory."""
+        if self._process is None:
+            return
+        self._ready.put(None)
+        self._process.join(timeout)
+        if self._process.is_alive():
+            logger.warning("Video encoder did not finish in time; terminating")
+            self._process.terminate()
+            self._process.join()
+
+        s = self.stats()
+        if s['failed']:
+            logger.error(f"Video recording of {self.filename} with codec {self.codec} "
+                         f"failed; written={s['written']} offered={s['offered']}")
+        else:
+            logger.info(f"Video recording finished: written={s['written']} "
+                        f"dropped={s['dropped']} offered={s['offered']}")
+
+        self._frames = None
+        self._shm.close()
+        self._shm.unlink()
+        self._process = None
@@ -0,0 +1,60 @@
+"""Check the precomputed ray table against librealsense's deprojection."""
+
+import pytest
+
+np = pytest.importorskip("numpy")
+# ImportError too: the wheel needs libusb and librealsense at load time
+rs = pytest.importorskip("pyrealsense2", exc_type=ImportError)
+
+from src.utils.deprojection import build_ray_table, RayTable  # noqa: E402
+
+WIDTH, HEIGHT = 64, 48
+
+MODELS = [
+    (rs.distortion.none, [0.0, 0.0, 0.0, 0.0, 0.0]),
+    (rs.distortion.brown_conrady, [0.12, -0.25, 0.001, -0.002, 0.08]),
+    (rs.distortion.inverse_brown_conrady, [0.12, -0.25, 0.001, -0.002, 0.08]),
+    (rs.distortion.kannala_brandt4, [0.31, 0.05, -0.012, 0.002, 0.0]),
+    (rs.distortion.ftheta, [0.92, 0.0, 0.0, 0.0, 0.0]),
+]
+
+
+def make_intrinsics(model, coeffs):
+    intrin = rs.intrinsics()
+    intrin.width, intrin.height = WIDTH, HEIGHT
+    intrin.ppx, intrin.ppy = 31.7, 24.2
+    intrin.fx, intrin.fy = 40.5, 40.1
+    intrin.model = model
+    intrin.coeffs = coeffs
+    return intrin
+
+
+@pytest.mark.parametrize("model, coeffs", MODELS, ids=[str(m) for m, _ in MODELS])
+def test_ray_table_matches_librealsense(model, coeffs):
+    intrin = make_intrinsics(model, coeffs)
+    rays = build_ray_table(intrin)
+    assert rays.shape == (HEIGHT, WIDTH, 2)
+
+    depth = np.float32(1.7)
+    for v in range(0, HEIGHT, 3):
+        for u in range(0, WIDTH, 3):
+            expected = rs.rs2_deproject_pixel_to_point(intrin, [u, v], float(depth))
+            x, y = rays[v, u] * depth
+            np.testing.assert_allclose([x, y, depth], expected, rtol=1e-6, atol=1e-7,
+                                       err_msg=f"pixel ({u}, {v})")
+
+
+def test_ray_table_deproject_matches_per_pixel_calls():
+    intrin = make_intrinsics(*MODELS[1])
+    table = RayTable.from_intrinsics(intrin)
+    try:
+        px = [0, 10, 31, 63]
+        py = [0, 47, 24, 5]
+        depths = [0.5, 1.25, 2.0, 3.75]
+        points = table.deproject(px, py, depths)
+        expected = [rs.rs2_deproject_pixel_to_point(intrin, [u, v], d)
+                    for u, v, d in zip(px, py, depths)]
+        np.testing.assert_allclose(points, expected, rtol=1e-6, atol=1e-7)
+        assert not table.rays.flags.writeable
+    finally:
+        table.close()
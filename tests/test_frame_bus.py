@@ -0,0 +1,194 @@
+"""Tests for the FrameBus overflow policies, stats and shutdown."""
+
+import threading
+import time
+
+import pytest
+
+from src.utils.frame_bus import FrameBus, FrameConsumer, BLOCK, DROP_OLDEST, DROP_NEWEST
+
+
+class GatedConsumer(FrameConsumer):
+    """Records frames; holds its worker on the first frame until released."""
+
+    def __init__(self, delay=0.0, fail_on=()):
+        self.frames = []
+        self.closes = 0
+        self.delay = delay
+        self.fail_on = set(fail_on)
+        self.started = threading.Event()
+        self.release = threading.Event()
+
+    def consume(self, frame):
+        self.started.set()
+        self.release.wait(5)
+        time.sleep(self.delay)
+        if frame in self.fail_on:
+            raise RuntimeError(f"bad frame {frame}")
+        self.frames.append(frame)
+
+    def close(self):
+        self.closes += 1
+
+
+def wait_until(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            raise AssertionError("condition not met in time")
+        time.sleep(0.001)
+
+
+def fill_blocked(policy):
+    """Publish frames 0..4 to a size-2 queue whose worker is stuck on frame 0."""
+    bus = FrameBus()
+    consumer = GatedConsumer()
+    bus.register(consumer, maxsize=2, policy=policy, name='c')
+    bus.publish(0)
+    assert consumer.started.wait(5)
+    for frame in range(1, 5):
+        bus.publish(frame)
+    return bus, consumer
+
+
+def test_drop_newest_discards_incoming_frames():
+    bus, consumer = fill_blocked(DROP_NEWEST)
+    stats = bus.stats()['c']
+    assert stats['depth'] == 2
+    assert stats['dropped'] == 2
+
+    consumer.release.set()
+    bus.close()
+    assert consumer.frames == [0, 1, 2]
+
+
+def test_drop_oldest_keeps_latest_frame():
+    bus, consumer = fill_blocked(DROP_OLDEST)
+    assert bus.stats()['c']['dropped'] == 2
+
+    consumer.release.set()
+    bus.close()
+    assert consumer.frames == [0, 3, 4]
+
+
+def test_block_loses_nothing():
+    bus = FrameBus()
+    consumer = GatedConsumer(delay=0.001)
+    consumer.release.set()
+    bus.register(consumer, maxsize=1, policy=BLOCK, name='c')
+    for frame in range(50):
+        bus.publish(frame)
+    assert bus.stats()['c']['dropped'] == 0
+
+    bus.close()
+    assert consumer.frames == list(range(50))
+
+
+def test_close_drains_queue_and_closes_consumer_once():
+    bus = FrameBus()
+    consumer = GatedConsumer()
+    bus.register(consumer, maxsize=16, policy=BLOCK, name='c')
+    for frame in range(10):
+        bus.publish(frame)
+
+    consumer.release.set()
+    bus.close()
+    assert consumer.frames == list(range(10))
+    assert consumer.closes == 1
+    assert bus.stats() == {}
+
+
+def test_unregister_closes_only_that_consumer():
+    bus = FrameBus()
+    first, second = GatedConsumer(), GatedConsumer()
+    first.release.set()
+    second.release.set()
+    bus.register(first, name='first')
+    bus.register(second, name='second')
+    bus.publish(0)
+
+    bus.unregister('first')
+    assert first.frames == [0] and first.closes == 1
+    assert list(bus.stats()) == ['second']
+
+    bus.publish(1)
+    bus.close()
+    assert second.frames == [0, 1] and second.closes == 1
+
+
+def test_consumer_error_is_counted_and_worker_survives():
+    bus = FrameBus()
+    consumer = GatedConsumer(fail_on={1})
+    consumer.release.set()
+    bus.register(consumer, maxsize=8, policy=BLOCK, name='c')
+    for frame in range(3):
+        bus.publish(frame)
+
+    wait_until(lambda: bus.stats()['c']['processed'] + bus.stats()['c']['errors'] == 3)
+    stats = bus.stats()['c']
+    assert stats['errors'] == 1
+    assert stats['processed'] == 2
+
+    bus.close()
+    assert consumer.frames == [0, 2]
+
+
+def test_register_rejects_unknown_policy_and_duplicate_name():
+    bus = FrameBus()
+    with pytest.raises(ValueError):
+        bus.register(GatedConsumer(), policy='sometimes')
+    bus.register(GatedConsumer(), name='c')
+    with pytest.raises(ValueError):
+        bus.register(GatedConsumer(), name='c')
+    bus.close()
+
+
+@pytest.mark.parametrize("policy", [DROP_NEWEST, DROP_OLDEST, BLOCK])
+def test_close_honours_timeout_for_stuck_consumer(policy):
+    # Worker stuck on frame 0 with a full queue, as with a hung plugin
+    bus, consumer = fill_blocked(policy) if policy != BLOCK else stuck_block_bus()
+    start = time.monotonic()
+    try:
+        bus.close(timeout=0.2)
+        assert time.monotonic() - start < 2.0
+        assert bus.stats() == {}
+    finally:
+        consumer.release.set()
+
+
+def stuck_block_bus():
+    bus = FrameBus()
+    consumer = GatedConsumer()
+    bus.register(consumer, maxsize=1, policy=BLOCK, name='c')
+    bus.publish(0)
+    assert consumer.started.wait(5)
+    bus.publish(1)
+    return bus, consumer
+
+
+def test_stats_while_registering_from_another_thread():
+    bus = FrameBus()
+    errors = []
+    done = threading.Event()
+
+    def poll():
+        try:
+            while not done.is_set():
+                bus.stats()
+                bus.publish(0)
+                time.sleep(0)
+        except Exception as exc:  # pragma: no cover - failure path
+            errors.append(exc)
+
+    poller = threading.Thread(target=poll)
+    poller.start()
+    for i in range(20):
+        consumer = GatedConsumer()
+        consumer.release.set()
+        bus.register(consumer, name=f"c{i}")
+    for i in range(20):
+        bus.unregister(f"c{i}")
+    done.set()
+    poller.join()
+    bus.close()
+    assert errors == []
@@ -0,0 +1,58 @@
+"""Smoke-test the soak harness and its memory check."""
+
+import pytest
+
+pytest.importorskip("numpy")
+pytest.importorskip("cv2")
+pytest.importorskip("pyrealsense2", exc_type=ImportError)
+pytest.importorskip("filterpy")
+pytest.importorskip("mediapipe")
+
+from src.soak import SoakHarness  # noqa: E402
+from src.camera.synthetic_camera import NUM_LANDMARKS  # noqa: E402
+
+
+def rss_samples(seconds, mb):
+    """Fabricated samples with only elapsed time and RSS varying."""
+    return [{'elapsed_s': t, 'rss_mb': m, 'frames': 0, 'csv_bytes': 0,
+             'throughput_fps': 30.0, 'kalman_filters': 0}
+            for t, m in zip(seconds, mb)]
+
+
+def test_short_unthrottled_run(tmp_path):
+    csv_path = tmp_path / "soak.csv"
+    harness = SoakHarness(duration=3, interval=0.5, fps=0, extra_joints=4,
+                          extra_id_pool=8, trace_top=0, csv_path=str(csv_path))
+    harness.run()
+
+    assert harness.probe.count > 0
+    with open(csv_path) as f:
+        assert sum(1 for _ in f) - 1 == harness.probe.count
+    assert len(harness.kalman.filters) == NUM_LANDMARKS + 8
+    assert harness.samples and all('latency_p95_ms' in s for s in harness.samples)
+    assert not any('RSS' in failure or 'CSV' in failure or 'Kalman' in failure
+                   for failure in harness.failures)
+
+
+def test_warmup_growth_on_short_run_passes(tmp_path):
+    harness = SoakHarness(use_kalman=False, csv_path=str(tmp_path / "soak.csv"))
+    # 2 MB of warm-up growth over 20 s would extrapolate to about 360 MB/h
+    harness.samples = rss_samples(range(0, 21, 5), [100, 101, 102, 102, 102])
+    harness._evaluate()
+    assert harness.failures == []
+
+
+def test_large_growth_on_short_run_fails(tmp_path):
+    harness = SoakHarness(use_kalman=False, csv_path=str(tmp_path / "soak.csv"))
+    harness.samples = rss_samples(range(0, 21, 5), [100, 105, 110, 115, 120])
+    harness._evaluate()
+    assert len(harness.failures) == 1 and 'RSS grew' in harness.failures[0]
+
+
+def test_steady_slope_checked_on_long_run(tmp_path):
+    harness = SoakHarness(use_kalman=False, csv_path=str(tmp_path / "soak.csv"),
+                          min_slope_span=600)
+    seconds = range(0, 1201, 60)
+    harness.samples = rss_samples(seconds, [100 + t / 36 for t in seconds])
+    harness._evaluate()
+    assert len(harness.failures) == 1 and 'RSS grows 100.0 MB/h' in harness.failures[0]
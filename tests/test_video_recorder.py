@@ -0,0 +1,133 @@
+"""Tests for VideoRecorder decimation, dropping, failures and the sidecar."""
+
+import csv
+import shutil
+from datetime import datetime, timedelta
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("cv2")
+
+from src.utils.video_recorder import VideoRecorder  # noqa: E402
+
+WIDTH, HEIGHT = 64, 48
+START = datetime(2026, 1, 1, 12, 0, 0)
+
+
+def frames(n):
+    """Yield (image, timestamp) pairs for `n` small synthetic frames."""
+    for i in range(n):
+        image = np.full((HEIGHT, WIDTH, 3), i % 256, dtype=np.uint8)
+        yield image, START + timedelta(milliseconds=33 * i)
+
+
+def read_sidecar(video_path):
+    with open(video_path.with_suffix('.timestamps.csv'), newline='') as f:
+        return list(csv.DictReader(f))
+
+
+def test_decimation_keeps_every_nth_frame_with_timestamps(tmp_path):
+    path = tmp_path / "out.avi"
+    recorder = VideoRecorder(str(path), fps=30, codec='MJPG', decimation=3, slots=16,
+                             frame_size=(WIDTH, HEIGHT))
+    queued = [recorder.write(image, ts) for image, ts in frames(9)]
+    recorder.close()
+
+    assert queued == [True, False, False] * 3
+    stats = recorder.stats()
+    assert stats['offered'] == 9
+    assert stats['written'] == 3
+    assert stats['dropped'] == 0
+    assert not stats['failed']
+    assert recorder.fps == 10
+
+    rows = read_sidecar(path)
+    expected = [START + timedelta(milliseconds=33 * i) for i in (0, 3, 6)]
+    assert [int(r['frame']) for r in rows] == [0, 1, 2]
+    assert [datetime.fromisoformat(r['timestamp']) for r in rows] == expected
+    assert path.stat().st_size > 0
+
+
+def test_frames_dropped_when_all_slots_busy(tmp_path):
+    path = tmp_path / "out.avi"
+    recorder = VideoRecorder(str(path), codec='MJPG', slots=1, frame_size=(WIDTH, HEIGHT))
+    queued = [recorder.write(image, ts) for image, ts in frames(200)]
+    recorder.close()
+
+    stats = recorder.stats()
+    assert stats['dropped'] > 0
+    assert stats['written'] + stats['dropped'] == 200
+    assert sum(queued) == stats['written']
+    assert len(read_sidecar(path)) == stats['written']
+
+
+def test_first_write_waits_for_encoder(tmp_path):
+    path = tmp_path / "out.avi"
+    recorder = VideoRecorder(str(path), codec='MJPG', slots=4)
+    image, ts = next(frames(1))
+    assert recorder.write(image, ts)
+    recorder.close()
+    assert recorder.stats()['written'] == 1
+
+
+def test_failed_flag_when_writer_cannot_open(tmp_path):
+    path = tmp_path / "missing" / "out.avi"
+    recorder = VideoRecorder(str(path), codec='MJPG', frame_size=(WIDTH, HEIGHT))
+    assert recorder.failed
+    queued = [recorder.write(image, ts) for image, ts in frames(5)]
+    recorder.close()
+
+    assert queued == [False] * 5
+    stats = recorder.stats()
+    assert stats['failed']
+    assert stats['written'] == 0
+    assert stats['dropped'] == 5
+    assert not path.with_suffix('.timestamps.csv').exists()
+
+
+def test_mismatched_frame_shape_is_dropped(tmp_path):
+    recorder = VideoRecorder(str(tmp_path / "out.avi"), codec='MJPG',
+                             frame_size=(WIDTH, HEIGHT))
+    assert not recorder.write(np.zeros((HEIGHT * 2, WIDTH, 3), dtype=np.uint8), START)
+    recorder.close()
+    assert recorder.stats()['dropped'] == 1
+
+
+@pytest.mark.parametrize("kwargs", [
+    {'decimation': 0},
+    {'slots': 0},
+    {'codec': 'mp4'},
+    {'bitrate': 0},
+    {'bitrate': 500, 'codec': 'ZZZZ'},
+])
+def test_invalid_arguments_rejected(tmp_path, kwargs):
+    with pytest.raises(ValueError):
+        VideoRecorder(str(tmp_path / "out.avi"), **kwargs)
+
+
+def test_bitrate_requires_ffmpeg(tmp_path, monkeypatch):
+    monkeypatch.setattr(shutil, 'which', lambda name: None)
+    with pytest.raises(ValueError, match="ffmpeg"):
+        VideoRecorder(str(tmp_path / "out.avi"), codec='mp4v', bitrate=500)
+
+
+@pytest.mark.skipif(shutil.which('ffmpeg') is None, reason="ffmpeg not installed")
+def test_bitrate_changes_output_size(tmp_path):
+    # Moving gradient with light noise: compressible, so rate control can act
+    rng = np.random.default_rng(0)
+    ramp = np.linspace(0, 255, WIDTH * 4, dtype=np.float32)
+    sizes = {}
+    for bitrate in (100, 4000):
+        path = tmp_path / f"out_{bitrate}.mp4"
+        recorder = VideoRecorder(str(path), codec='mp4v', bitrate=bitrate, slots=64,
+                                 frame_size=(WIDTH * 4, HEIGHT * 4))
+        for i in range(60):
+            row = (ramp + 8 * i) % 256
+            image = np.repeat(np.broadcast_to(row, (HEIGHT * 4, WIDTH * 4))[..., None], 3, axis=2)
+            image = (image + rng.normal(0, 6, image.shape)).clip(0, 255).astype(np.uint8)
+            recorder.write(image, START + timedelta(milliseconds=33 * i))
+        recorder.close()
+        assert not recorder.failed
+        sizes[bitrate] = path.stat().st_size
+    assert sizes[4000] > 2 * sizes[100]